@@ -9,7 +9,7 @@ Reports:
   - Dockerfile port mismatches: EXPOSE port ≠ declared port
   - Missing health check paths
 
-Output: JSON to stdout
+Output: JSON to stdout (compact; pass --pretty to indent)
   {
     "services_count": N,
     "services": [...],
@@ -17,18 +17,93 @@ Output: JSON to stdout
   }
 """
 
+import functools
 import json
 import os
 import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import yaml
 
+# libyaml's C loader is much faster; fall back when PyYAML was built
+# without it.
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
+# Hostname suffixes of kindling-provisioned dependencies (redis, postgres, ...);
+# a tuple so str.endswith can test them all in one call.
+_DEP_SUFFIXES = ("redis", "postgres", "postgresql", "mongodb",
+                 "mongo", "mysql", "rabbitmq", "nats", "kafka")
+
+# ── Precompiled patterns ─────────────────────────────────────────
+
+_ACTOR_PREFIX_RE = re.compile(r'\$\{\{\s*github\.actor\s*\}\}-')
+_TEMPLATE_EXPR_RE = re.compile(r'\$\{\{[^}]*\}\}')
+_WS_RE = re.compile(r'\$\{\{\s*github\.workspace\s*\}\}(/)?')
+_URL_RE = re.compile(r'(?:https?|redis|mongodb|amqp|grpc)://([^:/\s]+):(\d+)')
+_HOSTPORT_RE = re.compile(r'([a-zA-Z][\w.-]*):(\d+)')
+# Dockerfiles are scanned as bytes — EXPOSE lines are ASCII, so there
+# is no need to decode the whole file.
+_EXPOSE_RE = re.compile(rb'^[ \t]*EXPOSE[ \t]+(.*)$', re.IGNORECASE | re.MULTILINE)
+# Leading digits of each whitespace-separated EXPOSE argument ("3000/tcp")
+_PORT_TOKEN_RE = re.compile(rb'(?<!\S)\d+')
+
 
 def parse_workflow(path: str) -> dict:
     with open(path) as f:
-        return yaml.safe_load(f)
+        return yaml.load(f, Loader=_Loader)
+
+
+def _strip_workspace(context: str) -> str:
+    """Make a build context relative: "${{ github.workspace }}/x" -> "x",
+    bare "${{ github.workspace }}" -> "."."""
+    return _WS_RE.sub(lambda m: "" if m.group(1) else ".", context)
+
+
+def _reject_json_constant(name: str):
+    # json.loads accepts NaN/Infinity but YAML reads them as strings;
+    # refuse them so such values take the YAML path.
+    raise ValueError(f"non-standard JSON constant {name}")
+
+
+def _parse_json_float(literal: str) -> float:
+    # PyYAML only reads exponent forms as floats in narrow cases ("1e3"
+    # and "1.5e300" stay strings); leave every exponent to the YAML path.
+    if "e" in literal or "E" in literal:
+        raise ValueError(f"exponent-form number {literal}")
+    return float(literal)
+
+
+def _fast_parse_list(raw: str):
+    """Parse an inline env/dependencies list.
+
+    Empty values, and values that do not open with list syntax ("[" or
+    "-"), return None without touching a parser. Inline ``[...]`` values
+    are usually plain JSON, which json.loads handles far faster than
+    YAML; anything else, JSON that fails to decode, or JSON using number
+    forms YAML reads differently (NaN/Infinity, exponents) goes through
+    the YAML loader as before. Returns None when the value is
+    unparseable.
+    """
+    if not isinstance(raw, str) or not raw or raw.isspace():
+        return None
+    first = raw.lstrip()[:1]
+    if first == "[":
+        try:
+            return json.loads(raw, parse_float=_parse_json_float,
+                              parse_constant=_reject_json_constant)
+        except ValueError:
+            pass
+    elif first != "-":
+        return None  # not list syntax
+    try:
+        return yaml.load(raw, Loader=_Loader)
+    except Exception:
+        return None
 
 
 def extract_services(data: dict) -> list[dict]:
@@ -40,47 +115,33 @@ def extract_services(data: dict) -> list[dict]:
             if "kindling-deploy" not in uses:
                 continue
             w = step.get("with") or {}
-            name_raw = w.get("name", "")
+            g = w.get
+            name_raw = g("name", "")
             # Strip ${{ github.actor }}- prefix pattern
-            name_clean = re.sub(
-                r'\$\{\{\s*github\.actor\s*\}\}-', '', name_raw
-            )
+            name_clean = _ACTOR_PREFIX_RE.sub('', name_raw)
             # Parse env list (YAML string of list)
             env_vars = {}
-            env_raw = w.get("env", "")
-            if env_raw:
-                try:
-                    env_list = yaml.safe_load(env_raw)
-                    if isinstance(env_list, list):
-                        for e in env_list:
-                            if isinstance(e, dict):
-                                env_vars[e.get("name", "")] = e.get("value", "")
-                except Exception:
-                    pass
+            env_list = _fast_parse_list(g("env", ""))
+            if isinstance(env_list, list):
+                env_vars = {e.get("name", ""): e.get("value", "")
+                            for e in env_list if isinstance(e, dict)}
 
             # Parse dependencies
             deps = []
-            dep_raw = w.get("dependencies", "")
-            if dep_raw:
-                try:
-                    dep_list = yaml.safe_load(dep_raw)
-                    if isinstance(dep_list, list):
-                        deps = dep_list
-                except Exception:
-                    pass
+            dep_list = _fast_parse_list(g("dependencies", ""))
+            if isinstance(dep_list, list):
+                deps = dep_list
 
             services.append({
                 "name": name_clean,
                 "name_raw": name_raw,
-                "port": w.get("port", ""),
-                "health_check_path": w.get("health-check-path", ""),
-                "context": w.get("context", "").replace(
-                    "${{ github.workspace }}/", ""
-                ).replace("${{ github.workspace }}", "."),
-                "image": w.get("image", ""),
+                "port": g("port", ""),
+                "health_check_path": g("health-check-path", ""),
+                "context": _strip_workspace(g("context", "")),
+                "image": g("image", ""),
                 "env": env_vars,
                 "dependencies": deps,
-                "ingress_host": w.get("ingress-host", ""),
+                "ingress_host": g("ingress-host", ""),
             })
 
     return services
@@ -95,35 +156,39 @@ def extract_builds(data: dict) -> list[dict]:
             if "kindling-build" not in uses:
                 continue
             w = step.get("with") or {}
+            g = w.get
             builds.append({
-                "name": w.get("name", ""),
-                "context": w.get("context", "").replace(
-                    "${{ github.workspace }}/", ""
-                ).replace("${{ github.workspace }}", "."),
-                "image": w.get("image", ""),
+                "name": g("name", ""),
+                "context": _strip_workspace(g("context", "")),
+                "image": g("image", ""),
             })
     return builds
 
 
-def get_dockerfile_expose(clone_dir: str, context: str) -> list[str]:
-    """Read EXPOSE directives from a Dockerfile."""
-    dockerfile = Path(clone_dir) / context / "Dockerfile"
-    if not dockerfile.exists():
-        # Try lowercase
-        dockerfile = Path(clone_dir) / context / "dockerfile"
-    if not dockerfile.exists():
-        return []
-    ports = []
-    try:
-        for line in dockerfile.read_text().splitlines():
-            if re.match(r'^\s*EXPOSE\s', line, re.IGNORECASE):
-                for token in line.split()[1:]:
-                    port = re.match(r'(\d+)', token)
-                    if port:
-                        ports.append(port.group(1))
-    except Exception:
-        pass
-    return ports
+@functools.lru_cache(maxsize=None)
+def get_dockerfile_expose(clone_dir: str, context: str) -> tuple[str, ...]:
+    """Read EXPOSE directives from a Dockerfile.
+
+    Cached per (clone_dir, context) so services sharing a build context
+    only read and parse their Dockerfile once.
+    """
+    base = Path(clone_dir) / context
+    # Try Dockerfile, then lowercase
+    for name in ("Dockerfile", "dockerfile"):
+        try:
+            content = (base / name).read_bytes()
+        except FileNotFoundError:
+            continue
+        except Exception:
+            return ()
+        break
+    else:
+        return ()
+    return tuple(
+        port.decode("ascii")
+        for args in _EXPOSE_RE.findall(content)
+        for port in _PORT_TOKEN_RE.findall(args)
+    )
 
 
 def validate_networking(services: list[dict], builds: list[dict],
@@ -136,20 +201,33 @@ def validate_networking(services: list[dict], builds: list[dict],
     for svc in services:
         svc_by_name[svc["name"]] = svc
 
-    # Also build a list of known service name fragments
-    svc_names = set(svc_by_name.keys())
+    # Reverse index: last "-" segment of each service name ->
+    # (name, "-name") pairs, with the suffix built once up front.
+    # A host can only equal or end with "-<name>" if it shares that
+    # final segment, so this narrows matching to a single dict lookup.
+    svc_by_suffix = {}
+    for sn in svc_by_name:
+        svc_by_suffix.setdefault(sn.rsplit("-", 1)[-1], []).append((sn, "-" + sn))
+
+    # Prefetch EXPOSE ports for every distinct build context in parallel;
+    # the Dockerfile reads are I/O-bound and independent.
+    contexts = list({svc["context"] for svc in services
+                     if svc.get("context") and svc.get("port")})
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        expose_by_context = dict(zip(contexts, ex.map(
+            lambda c: get_dockerfile_expose(clone_dir, c), contexts)))
 
     for svc in services:
         # ── Check env var URLs reference real services with correct ports ──
         for env_name, env_value in svc.get("env", {}).items():
+            # Both URL forms need a colon; skip plain values outright
+            if ":" not in env_value:
+                continue
             # Match patterns like http://xxx-orders:5000 or redis://xxx-redis:6379
-            url_match = re.search(
-                r'(?:https?|redis|mongodb|amqp|grpc)://([^:/\s]+):(\d+)',
-                env_value
-            )
+            url_match = _URL_RE.search(env_value)
             if not url_match:
                 # Also check for host:port without scheme
-                url_match = re.search(r'([a-zA-Z][\w.-]*):(\d+)', env_value)
+                url_match = _HOSTPORT_RE.search(env_value)
             if not url_match:
                 continue
 
@@ -157,19 +235,18 @@ def validate_networking(services: list[dict], builds: list[dict],
             target_port = url_match.group(2)
 
             # Strip ${{ github.actor }}- prefix
-            target_host_clean = re.sub(
-                r'\$\{\{\s*github\.actor\s*\}\}-', '', target_host
-            )
+            target_host_clean = _ACTOR_PREFIX_RE.sub('', target_host)
 
             # Find which service this references
-            target_svc = None
-            for sn in svc_names:
-                # Match if the target host ends with the service name
-                # e.g. "user-orders" matches service "orders"
-                # or exact match like "orders-redis" for dependency
-                if target_host_clean == sn or target_host_clean.endswith(f"-{sn}"):
-                    target_svc = svc_by_name[sn]
-                    break
+            target_svc = svc_by_name.get(target_host_clean)
+            if target_svc is None:
+                tail = target_host_clean.rsplit("-", 1)[-1]
+                for sn, suffix in svc_by_suffix.get(tail, ()):
+                    # Match if the target host ends with the service name
+                    # e.g. "user-orders" matches service "orders"
+                    if target_host_clean.endswith(suffix):
+                        target_svc = svc_by_name[sn]
+                        break
 
             if target_svc:
                 # Check port matches
@@ -186,9 +263,7 @@ def validate_networking(services: list[dict], builds: list[dict],
                     })
             else:
                 # Check if it might be a dependency (redis, postgres, etc.)
-                dep_suffixes = ["redis", "postgres", "postgresql", "mongodb",
-                                "mongo", "mysql", "rabbitmq", "nats", "kafka"]
-                is_dep = any(target_host_clean.endswith(s) for s in dep_suffixes)
+                is_dep = target_host_clean.endswith(_DEP_SUFFIXES)
 
                 if not is_dep:
                     issues.append({
@@ -203,7 +278,7 @@ def validate_networking(services: list[dict], builds: list[dict],
 
         # ── Check Dockerfile EXPOSE matches declared port ──────────
         if svc.get("context") and svc.get("port"):
-            expose_ports = get_dockerfile_expose(clone_dir, svc["context"])
+            expose_ports = expose_by_context[svc["context"]]
             if expose_ports and svc["port"] not in expose_ports:
                 issues.append({
                     "severity": "warning",
@@ -287,11 +362,9 @@ def services_to_dse_manifests(
         for env_name, env_value in svc.get("env", {}).items():
             # Replace ${{ github.actor }}-<svc> with just <svc>
             # (in a fuzz cluster there's no actor prefix)
-            clean_value = re.sub(
-                r'\$\{\{\s*github\.actor\s*\}\}-', '', env_value
-            )
+            clean_value = _ACTOR_PREFIX_RE.sub('', env_value)
             # Replace any remaining ${{ ... }} with empty string
-            clean_value = re.sub(r'\$\{\{[^}]*\}\}', '', clean_value)
+            clean_value = _TEMPLATE_EXPR_RE.sub('', clean_value)
             env_list.append({"name": env_name, "value": clean_value})
 
         # Build dependencies list
@@ -339,7 +412,7 @@ def services_to_dse_manifests(
 
         # Add ingress if the service had one
         if svc.get("ingress_host"):
-            host = re.sub(r'\$\{\{[^}]*\}\}', 'fuzz', svc["ingress_host"])
+            host = _TEMPLATE_EXPR_RE.sub('fuzz', svc["ingress_host"])
             dse["spec"]["ingress"] = {
                 "enabled": True,
                 "host": host,
@@ -359,6 +432,15 @@ def emit_dse_yaml(manifests: list[dict]) -> str:
     return "---\n".join(docs)
 
 
+def write_json(obj, stream, pretty: bool = False) -> None:
+    """Write obj as JSON plus a trailing newline (compact by default)."""
+    if pretty:
+        text = json.dumps(obj, indent=2)
+    else:
+        text = json.dumps(obj, separators=(",", ":"))
+    stream.write(text + "\n")
+
+
 def main():
     import argparse
 
@@ -375,12 +457,20 @@ def main():
         "--prefix", default="fuzz",
         help="Name prefix for DSE resources and image tags (default: fuzz)",
     )
+    parser.add_argument(
+        "--pretty", action="store_true",
+        help="Indent the analysis JSON (default: compact)",
+    )
     args = parser.parse_args()
 
     data = parse_workflow(args.workflow)
-    services = extract_services(data)
-    builds = extract_builds(data)
-    issues = validate_networking(services, builds, args.clone_dir)
+    if isinstance(data, dict) and data.get("jobs"):
+        services = extract_services(data)
+        builds = extract_builds(data)
+        issues = validate_networking(services, builds, args.clone_dir)
+    else:
+        # Empty or job-less workflow — nothing to extract or validate
+        services, builds, issues = [], [], []
 
     result = {
         "services_count": len(services),
@@ -392,11 +482,9 @@ def main():
     # Always output analysis JSON to stdout
     # (When --emit-dse uses stdout, analysis goes to stderr instead)
     if args.emit_dse and args.emit_dse == "-":
-        json.dump(result, sys.stderr, indent=2)
-        print(file=sys.stderr)  # trailing newline
+        write_json(result, sys.stderr, pretty=args.pretty)
     else:
-        json.dump(result, sys.stdout, indent=2)
-        print()  # trailing newline
+        write_json(result, sys.stdout, pretty=args.pretty)
 
     # Emit DSE manifests if requested
     if args.emit_dse:
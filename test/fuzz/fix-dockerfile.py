@@ -4,7 +4,9 @@ fix-dockerfile.py — LLM-powered Dockerfile analysis and repair.
 
 Before building a Docker image in the fuzz harness, this script sends the
 Dockerfile (plus build-context metadata) to an LLM and asks it to produce
-a corrected version that will actually build.
+a corrected version that will actually build. Dockerfiles that pass a few
+cheap static checks (FROM present, COPY/ADD sources exist, no EOL base
+image) are echoed back unchanged without calling the LLM.
 
 It can also be called in "retry" mode: after a build failure, pass the
 error log and it will attempt a targeted fix.
@@ -27,6 +29,7 @@ Env vars:
 """
 
 import argparse
+import itertools
 import json
 import os
 import re
@@ -97,6 +100,41 @@ def call_llm(provider: str, api_key: str, model: str,
 
 # ── Context gathering ───────────────────────────────────────────
 
+MAX_CONTEXT_FILES = 200
+MAX_DEP_FILE_BYTES = 2000
+
+# Directory / file names never worth listing in the build context
+SKIP_NAMES = frozenset({".git", "node_modules", "vendor", "__pycache__",
+                        ".DS_Store"})
+
+
+def _iter_files(root: str):
+    """Yield build-context file paths relative to root, lazily.
+
+    Skipped directories are pruned before descending. Entries are
+    visited in sorted order, so any prefix of the output matches the
+    same prefix of a full sorted walk.
+    """
+    stack = [(root, "", True)]
+    while stack:
+        path, rel, is_dir = stack.pop()
+        if not is_dir:
+            yield rel
+            continue
+        try:
+            with os.scandir(path) as it:
+                entries = sorted(it, key=lambda e: e.name, reverse=True)
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.name in SKIP_NAMES:
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                stack.append((entry.path, rel + entry.name + "/", True))
+            elif entry.is_file():
+                stack.append((entry.path, rel + entry.name, False))
+
+
 def gather_context(context_dir: str, dockerfile_path: str) -> dict:
     """Gather build context metadata for the LLM."""
     ctx = {
@@ -107,17 +145,9 @@ def gather_context(context_dir: str, dockerfile_path: str) -> dict:
 
     context_path = Path(context_dir)
 
-    # List files in build context (limit depth to avoid massive trees)
-    all_files = []
-    for p in sorted(context_path.rglob("*")):
-        if p.is_file():
-            rel = str(p.relative_to(context_path))
-            # Skip .git, node_modules, vendor, __pycache__
-            if any(skip in rel for skip in [".git/", "node_modules/", "vendor/",
-                                            "__pycache__/", ".DS_Store"]):
-                continue
-            all_files.append(rel)
-    ctx["files"] = all_files[:200]  # cap at 200 files
+    # List files in build context; the walk stops once the cap is hit
+    ctx["files"] = list(itertools.islice(_iter_files(context_dir),
+                                         MAX_CONTEXT_FILES))
 
     # Read key dependency files
     dep_files = [
@@ -132,19 +162,126 @@ def gather_context(context_dir: str, dockerfile_path: str) -> dict:
 
     for name in dep_files:
         fp = context_path / name
-        if fp.exists():
-            try:
-                content = fp.read_text()
-                # Truncate large files (lock files, etc.)
-                if len(content) > 2000:
-                    content = content[:2000] + "\n... (truncated)"
-                ctx["dependency_files"][name] = content
-            except Exception:
-                pass
+        # Read only what we keep — lock files can run to tens of MB
+        try:
+            with open(fp, "rb") as f:
+                raw = f.read(MAX_DEP_FILE_BYTES + 1)
+        except OSError:
+            continue
+        content = raw[:MAX_DEP_FILE_BYTES].decode("utf-8", errors="replace")
+        # Truncate large files (lock files, etc.)
+        if len(raw) > MAX_DEP_FILE_BYTES:
+            content += "\n... (truncated)"
+        ctx["dependency_files"][name] = content
 
     return ctx
 
 
+# ── Static checks ────────────────────────────────────────────────
+
+_CONTINUATION_RE = re.compile(r'\\\r?\n')
+# Only spaces/tabs may separate a keyword from its operands, so a bare
+# "FROM" or "COPY" line never captures the next line's text; it
+# captures "" instead and is flagged.
+_FROM_RE = re.compile(
+    r'^[ \t]*FROM(?:[ \t]+(?:--\S+[ \t]+)*(\S*))?(?:[ \t\r].*)?$',
+    re.IGNORECASE | re.MULTILINE,
+)
+_COPY_RE = re.compile(r'^[ \t]*(?:COPY|ADD)(?:[ \t\r]+(.*))?$',
+                      re.IGNORECASE | re.MULTILINE)
+
+# Base images whose tags are end-of-life, keyed by image name.
+# Current as of 2026-10; needs periodic updates as releases age out.
+EOL_BASE_IMAGES = {
+    "node": ("8", "10", "12", "14", "16", "17", "18", "19", "20", "21",
+             "23", "25"),
+    "python": ("2.7", "3.6", "3.7", "3.8", "3.9"),
+    "alpine": ("3.10", "3.11", "3.12", "3.13", "3.14", "3.15", "3.16",
+               "3.17", "3.18", "3.19", "3.20"),
+    "golang": ("1.16", "1.17", "1.18", "1.19", "1.20", "1.21", "1.22",
+               "1.23", "1.24", "1.25"),
+    "debian": ("jessie", "stretch", "buster", "bullseye"),
+    "ubuntu": ("14.04", "16.04", "18.04", "20.04"),
+}
+
+
+def _is_eol_image(image: str) -> bool:
+    image = image.split("@", 1)[0]  # drop any @sha256:... digest
+    name, _, tag = image.rpartition(":")
+    if not name or "/" in tag:
+        return False  # no tag (or a registry port) — nothing to compare
+    name = name.removeprefix("docker.io/").removeprefix("library/")
+    for version in EOL_BASE_IMAGES.get(name, ()):
+        # "14" matches node:14, node:14.17-alpine, but not node:140
+        if tag.startswith(version) and not tag[len(version):][:1].isdigit():
+            return True
+    return False
+
+
+def _copy_sources(args: str) -> list[str] | None:
+    """Return the source operands of a COPY/ADD instruction.
+
+    Returns None when the operands are malformed (an exec-form list that
+    is not a JSON list of strings, or no destination), so the caller can
+    flag it rather than guess.
+    """
+    if args.lstrip().startswith("["):
+        try:
+            operands = json.loads(args)
+        except (ValueError, RecursionError):
+            return None
+        if not (isinstance(operands, list)
+                and all(isinstance(op, str) for op in operands)):
+            return None
+    else:
+        operands = args.split()
+    if any(op.startswith("--from") for op in operands):
+        return []  # copies out of another stage, not the build context
+    operands = [op for op in operands if not op.startswith("--")]
+    if len(operands) < 2:
+        return None  # needs at least one source and a destination
+    return operands[:-1]
+
+
+def _has_issues(ctx: dict) -> bool:
+    """Cheap local checks for problems that warrant an LLM pass.
+
+    Returns False only when the Dockerfile has a FROM instruction, no
+    end-of-life base image, and every COPY/ADD source it can verify is
+    present in the build context listing.
+    """
+    dockerfile = _CONTINUATION_RE.sub(" ", ctx["dockerfile"])
+
+    images = _FROM_RE.findall(dockerfile)
+    if not images or any(not image or image.startswith("--") for image in images):
+        return True
+    if any(_is_eol_image(image) for image in images):
+        return True
+
+    # Every listed file plus each of its parent directories
+    present = set(ctx["files"])
+    for f in ctx["files"]:
+        parts = f.split("/")
+        for i in range(1, len(parts)):
+            present.add("/".join(parts[:i]))
+    present = frozenset(present)
+
+    for args in _COPY_RE.findall(dockerfile):
+        sources = _copy_sources(args)
+        if sources is None:
+            return True
+        for src in sources:
+            if src.startswith(("http://", "https://", "git@", "<<")):
+                continue
+            if any(c in src for c in "*?[$"):
+                continue  # globs and build args can't be checked here
+            src = src.strip("/").removeprefix("./").strip("/")
+            if src in ("", ".") or src in present:
+                continue
+            return True
+    return False
+
+
 # ── Prompts ──────────────────────────────────────────────────────
 
 SYSTEM_PROMPT = """\
@@ -155,7 +292,7 @@ successfully. You will be given:
 3. Key dependency/manifest files from the project
 
 Common issues you should fix:
-- Outdated or EOL base images (e.g. node:14 → node:20-alpine, python:3.8 → python:3.12)
+- Outdated or EOL base images (e.g. node:14 → node:22-alpine, python:3.8 → python:3.12)
 - Missing or incorrect COPY sources (files referenced don't exist in the context)
 - Wrong working directory or build context assumptions
 - Missing build dependencies (e.g. gcc, make, git for native modules)
@@ -192,38 +329,44 @@ Rules:
 
 
 def build_user_prompt(ctx: dict, build_error: str | None = None) -> str:
-    parts = []
-
-    parts.append("## Dockerfile\n```dockerfile\n" + ctx["dockerfile"] + "\n```\n")
+    # Fragments are joined once at the end; each section after the first
+    # starts with the blank-line separator.
+    parts = ["## Dockerfile\n```dockerfile\n", ctx["dockerfile"], "\n```\n"]
 
     if ctx["files"]:
-        parts.append("## Files in build context\n```\n" +
-                      "\n".join(ctx["files"]) + "\n```\n")
+        parts.append("\n## Files in build context\n```\n")
+        parts.extend(f + "\n" for f in ctx["files"])
+        parts.append("```\n")
 
     if ctx["dependency_files"]:
-        parts.append("## Dependency / manifest files\n")
+        parts.append("\n## Dependency / manifest files\n")
         for name, content in ctx["dependency_files"].items():
-            parts.append(f"### {name}\n```\n{content}\n```\n")
+            parts.extend(("\n### ", name, "\n```\n", content, "\n```\n"))
 
     if build_error:
-        parts.append("## Build error output\n```\n" + build_error + "\n```\n")
-        parts.append("Fix the Dockerfile so this error is resolved.")
+        parts.extend(("\n## Build error output\n```\n", build_error, "\n```\n"))
+        parts.append("\nFix the Dockerfile so this error is resolved.")
     else:
-        parts.append("Analyze this Dockerfile and fix any issues that would "
-                      "prevent it from building. If it looks correct, return "
-                      "it unchanged.")
+        parts.append("\nAnalyze this Dockerfile and fix any issues that would "
+                     "prevent it from building. If it looks correct, return "
+                     "it unchanged.")
 
-    return "\n".join(parts)
+    return "".join(parts)
 
 
 # ── Response cleaning ────────────────────────────────────────────
 
+_FENCE_OPEN_RE = re.compile(r'^```(?:dockerfile|docker|Dockerfile)?\s*\n')
+_FENCE_CLOSE_RE = re.compile(r'\n```\s*$')
+_FROM_LINE_RE = re.compile(r'^FROM\s', re.MULTILINE)
+
+
 def clean_response(text: str) -> str:
     """Strip markdown fences and leading/trailing whitespace."""
     text = text.strip()
     # Remove ```dockerfile ... ``` wrapping
-    text = re.sub(r'^```(?:dockerfile|docker|Dockerfile)?\s*\n', '', text)
-    text = re.sub(r'\n```\s*$', '', text)
+    text = _FENCE_OPEN_RE.sub('', text, count=1)
+    text = _FENCE_CLOSE_RE.sub('', text, count=1)
     text = text.strip()
     return text
 
@@ -237,6 +380,16 @@ def main():
     parser.add_argument("--build-error", default=None, help="Build error output (for retry mode)")
     args = parser.parse_args()
 
+    # Gather context
+    ctx = gather_context(args.context_dir, args.dockerfile)
+
+    # Pre-build mode: skip the LLM round-trip when nothing looks wrong
+    if not args.build_error and not _has_issues(ctx):
+        print("[fix-dockerfile] static checks passed — keeping original",
+              file=sys.stderr)
+        sys.stdout.write(ctx["dockerfile"])
+        return
+
     # Resolve API config
     provider = os.environ.get("FUZZ_PROVIDER", "openai")
     api_key = os.environ.get("FUZZ_API_KEY") or os.environ.get("OPENAI_API_KEY", "")
@@ -248,9 +401,6 @@ def main():
     if not model:
         model = "claude-sonnet-4-20250514" if provider == "anthropic" else "gpt-4o"
 
-    # Gather context
-    ctx = gather_context(args.context_dir, args.dockerfile)
-
     # Build prompt
     if args.build_error:
         system = RETRY_SYSTEM_PROMPT
@@ -281,7 +431,7 @@ def main():
         sys.exit(1)
 
     # Sanity check: must contain FROM
-    if not re.search(r'^FROM\s', fixed, re.MULTILINE):
+    if not _FROM_LINE_RE.search(fixed):
         print("[fix-dockerfile] LLM response doesn't look like a Dockerfile "
               "(no FROM instruction)", file=sys.stderr)
         sys.exit(1)